@@ -15,10 +15,17 @@
 #
 """Configuration classes"""
 import collections
+import dataclasses
+import hashlib
 import json
+import logging
+import os
+import pickle
+import tempfile
 import typing
 from dataclasses import dataclass, field
 from enum import Enum
+from functools import lru_cache
 from pathlib import Path
 
 import numpy as np
@@ -26,6 +33,17 @@ from dataclasses_json import DataClassJsonMixin
 from gruut_ipa import IPA
 from phonemes2ids import BlankBetween
 
+from ._resources import __version__
+
+orjson: typing.Any = None
+try:
+    # Faster JSON parsing (pip install mycroft_mimic3_tts[orjson])
+    import orjson
+except ImportError:
+    pass
+
+_LOGGER = logging.getLogger(__name__)
+
 
 @dataclass
 class AudioConfig(DataClassJsonMixin):
@@ -324,8 +342,78 @@ class TrainingConfig(DataClassJsonMixin):
     @staticmethod
     def load(config_file: typing.TextIO) -> "TrainingConfig":
         """Load config from a JSON file"""
+        if orjson is not None:
+            return TrainingConfig.from_dict(
+                orjson.loads(config_file.read())  # pylint: disable=no-member
+            )
+
         return TrainingConfig.from_json(config_file.read())
 
+    @staticmethod
+    def load_cached(
+        config_path: typing.Union[str, Path],
+        cache_dir: typing.Optional[typing.Union[str, Path]] = None,
+    ) -> "TrainingConfig":
+        """Load config from a JSON file path, using a pickled copy in cache_dir if up to date.
+
+        Cache is keyed on the config's absolute path, its modification time,
+        the package version, and the config classes' field names.
+        """
+        config_path = Path(config_path)
+
+        if cache_dir is None:
+            with open(config_path, "r", encoding="utf-8") as config_file:
+                return TrainingConfig.load(config_file)
+
+        cache_dir = Path(cache_dir)
+        path_hash = hashlib.md5(str(config_path.absolute()).encode("utf-8")).hexdigest()
+        mtime_ns = config_path.stat().st_mtime_ns
+        cache_path = (
+            cache_dir
+            / f"config-{path_hash}-{__version__}-{_config_schema_hash()}-{mtime_ns}.pickle"
+        )
+
+        if cache_path.is_file():
+            try:
+                with open(cache_path, "rb") as cache_file:
+                    config = pickle.load(cache_file)
+
+                if isinstance(config, TrainingConfig):
+                    return config
+            except Exception:
+                _LOGGER.debug("Failed to load cached config from %s", cache_path)
+
+        with open(config_path, "r", encoding="utf-8") as config_file:
+            config = TrainingConfig.load(config_file)
+
+        temp_path: typing.Optional[str] = None
+        try:
+            cache_dir.mkdir(parents=True, exist_ok=True)
+
+            # Remove cached copies of older config files or package versions
+            for old_cache_path in cache_dir.glob(f"config-{path_hash}-*.pickle"):
+                old_cache_path.unlink()
+
+            # Write atomically so concurrent readers never see a partial file
+            with tempfile.NamedTemporaryFile(
+                mode="wb", dir=cache_dir, suffix=".tmp", delete=False
+            ) as temp_file:
+                temp_path = temp_file.name
+                pickle.dump(config, temp_file)
+
+            os.replace(temp_path, cache_path)
+        except (OSError, pickle.PicklingError):
+            _LOGGER.debug("Failed to cache config at %s", cache_path)
+
+            if temp_path is not None:
+                # Don't leave partial files in the cache
+                try:
+                    os.unlink(temp_path)
+                except OSError:
+                    pass
+
+        return config
+
     @staticmethod
     def load_and_merge(
         config: "TrainingConfig",
@@ -361,3 +449,31 @@ class TrainingConfig(DataClassJsonMixin):
                 TrainingConfig.recursive_update(base_dict[key], value)
             else:
                 base_dict[key] = value
+
+
+@lru_cache(maxsize=1)
+def _config_schema_hash() -> str:
+    """Get a short hash of TrainingConfig's field names (including nested configs)"""
+    field_names: typing.List[str] = []
+    pending_classes: typing.List[typing.Any] = [TrainingConfig]
+    seen_classes: typing.Set[typing.Any] = set()
+
+    while pending_classes:
+        config_class = pending_classes.pop()
+        if config_class in seen_classes:
+            continue
+
+        seen_classes.add(config_class)
+        for config_field in dataclasses.fields(config_class):
+            field_names.append(f"{config_class.__name__}.{config_field.name}")
+
+            # Look inside Optional[...], List[...], etc. for nested configs
+            field_types = [config_field.type]
+            while field_types:
+                field_type = field_types.pop()
+                if dataclasses.is_dataclass(field_type):
+                    pending_classes.append(field_type)
+
+                field_types.extend(getattr(field_type, "__args__", None) or [])
+
+    return hashlib.md5(",".join(sorted(field_names)).encode("utf-8")).hexdigest()[:8]
@@ -25,6 +25,7 @@ DEFAULT_VOICES_URL_FORMAT = (
 DEFAULT_VOICES_DOWNLOAD_DIR = (
     Path(XDG().XDG_DATA_HOME) / "mycroft" / "mimic3" / "voices"
 )
+DEFAULT_CONFIG_CACHE_DIR = Path(XDG().XDG_CACHE_HOME) / "mycroft" / "mimic3"
 
 DEFAULT_VOLUME = 100.0
 DEFAULT_RATE = 1.0
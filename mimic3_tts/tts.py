@@ -17,12 +17,15 @@
 import audioop
 import itertools
 import logging
+import os
 import re
 import typing
-from copy import deepcopy
-from dataclasses import dataclass, field
+from collections import deque
+from dataclasses import dataclass, field, replace
+from functools import lru_cache
 from pathlib import Path
 
+import numpy as np
 from gruut_ipa import IPA
 from xdgenvpy import XDG
 
@@ -41,6 +44,7 @@ from opentts_abc import (
 from ._resources import _VOICES
 from .config import TrainingConfig
 from .const import (
+    DEFAULT_CONFIG_CACHE_DIR,
     DEFAULT_LANGUAGE,
     DEFAULT_RATE,
     DEFAULT_VOICE,
@@ -58,6 +62,12 @@ _LOGGER = logging.getLogger(__name__)
 
 PHONEMES_LIST_TYPE = typing.List[typing.List[str]]
 
+# Keys of all voices that can be downloaded
+_KNOWN_VOICE_KEYS = frozenset(_VOICES)
+
+# Longest silence to keep in the cache (5 seconds at 22050 Hz, about 220 KB)
+_MAX_CACHED_SILENCE_SAMPLES = 5 * 22050
+
 
 # -----------------------------------------------------------------------------
 
@@ -108,6 +118,11 @@ class Mimic3Settings:
     no_download: bool = False
     """Do not download voices automatically"""
 
+    config_cache_dir: typing.Optional[
+        typing.Union[str, Path]
+    ] = DEFAULT_CONFIG_CACHE_DIR
+    """Directory to cache parsed voice configs in (disabled if None)"""
+
     use_cuda: bool = False
     """Use CUDA GPU acceleration (requires onnxruntime-gpu)"""
 
@@ -137,6 +152,9 @@ class Mimic3Phonemes:
     is_utterance: bool = True
     """True if this is the end of a full utterance"""
 
+    settings_version: int = 0
+    """Changes only when settings change (cheaper to compare than settings)"""
+
 
 class VoiceNotFoundError(Exception):
     """Raised if a voice cannot be found"""
@@ -145,6 +163,32 @@ class VoiceNotFoundError(Exception):
         super().__init__(f"Voice not found: {voice}")
 
 
+@lru_cache(maxsize=256)
+def _load_speakers(speakers_path: str, mtime_ns: int) -> typing.Tuple[str, ...]:
+    """Load speaker names from speakers.txt (cached until the file is modified)"""
+    with open(speakers_path, "r", encoding="utf-8") as speakers_file:
+        lines = speakers_file.read().splitlines()
+
+    return tuple(line.strip() for line in lines if line.strip())
+
+
+def _silence_bytes(num_samples: int) -> bytes:
+    """Get 16-bit silence with num_samples (short silences are shared between results)"""
+    if num_samples <= _MAX_CACHED_SILENCE_SAMPLES:
+        return _cached_silence_bytes(num_samples)
+
+    # Long breaks are not cached, so their memory is freed with the result
+    return bytes(num_samples * 2)
+
+
+@lru_cache(maxsize=32)
+def _cached_silence_bytes(num_samples: int) -> bytes:
+    """Get 16-bit silence with num_samples, cached by length"""
+    # bytes() gets zeroed memory directly, which is faster than building a
+    # numpy array of zeros and copying it out with tobytes().
+    return bytes(num_samples * 2)
+
+
 # -----------------------------------------------------------------------------
 
 
@@ -154,9 +198,32 @@ class Mimic3TextToSpeechSystem(TextToSpeechSystem):
     def __init__(self, settings: Mimic3Settings):
         self.settings = settings
 
-        self._results: typing.List[typing.Union[BaseResult, Mimic3Phonemes]] = []
+        # Pending results, or lazy iterables of results (see speak_text)
+        self._results: typing.Deque[
+            typing.Union[
+                BaseResult,
+                Mimic3Phonemes,
+                typing.Iterable[typing.Union[BaseResult, Mimic3Phonemes]],
+            ]
+        ] = deque()
+
+        # Copy of settings shared by results until settings change
+        self._settings_snapshot: typing.Optional[Mimic3Settings] = None
+        self._settings_version = 0
+
+        # Canonical key -> loaded voice
         self._loaded_voices: typing.Dict[str, Mimic3Voice] = {}
 
+        # Requested key -> canonical key of a loaded voice
+        self._voice_aliases: typing.Dict[str, str] = {}
+
+        # Voice key/alias/name -> canonical key (see _get_voice_index)
+        self._voice_index: typing.Optional[typing.Dict[str, str]] = None
+        self._voice_index_dirs: typing.Tuple[str, ...] = ()
+
+        # Canonical key -> model directory of voices on the file system
+        self._voice_dirs: typing.Dict[str, Path] = {}
+
     @staticmethod
     def get_default_voices_directories() -> typing.List[Path]:
         """Get list of directories to search for voices by default.
@@ -173,95 +240,48 @@ class Mimic3TextToSpeechSystem(TextToSpeechSystem):
 
     def get_voices(self) -> typing.Iterable[Voice]:
         """Returns an iterable of all available voices"""
-        voices_dirs: typing.Iterable[
-            typing.Union[str, Path]
-        ] = Mimic3TextToSpeechSystem.get_default_voices_directories()
-
-        if self.settings.voices_directories is not None:
-            voices_dirs = itertools.chain(self.settings.voices_directories, voices_dirs)
-
-        known_voices = set(_VOICES.keys())
+        known_voices = set(_KNOWN_VOICE_KEYS)
 
-        # voices/<language>/<voice>/
-        for voices_dir in voices_dirs:
-            voices_dir = Path(voices_dir)
-
-            if not voices_dir.is_dir() or voices_dir.name.startswith("."):
-                _LOGGER.debug("Skipping voice directory %s", voices_dir)
-                continue
+        for voice_key, voice_dir in self._scan_voice_dirs():
+            config_path = voice_dir / "config.json"
+            voice_lang, voice_name = voice_key.split("/", maxsplit=1)
 
-            _LOGGER.debug("Searching %s for voices", voices_dir)
+            # Load config
+            _LOGGER.debug("Loading config from %s", config_path)
+            config = TrainingConfig.load_cached(
+                config_path, cache_dir=self.settings.config_cache_dir
+            )
 
-            for lang_dir in voices_dir.iterdir():
-                if not lang_dir.is_dir() or lang_dir.name.startswith("."):
-                    continue
+            properties: typing.Dict[str, typing.Any] = {
+                "length_scale": config.inference.length_scale,
+                "noise_scale": config.inference.noise_scale,
+                "noise_w": config.inference.noise_w,
+            }
 
-                for voice_dir in lang_dir.iterdir():
-                    if not voice_dir.is_dir() or voice_dir.name.startswith("."):
-                        continue
+            # Load speaker names
+            speakers: typing.Optional[typing.Sequence[str]] = None
 
-                    config_path = voice_dir / "config.json"
-                    if not config_path.is_file():
-                        continue
+            speakers_path = voice_dir / "speakers.txt"
+            if speakers_path.is_file():
+                speakers = list(
+                    _load_speakers(str(speakers_path), speakers_path.stat().st_mtime_ns)
+                )
 
-                    _LOGGER.debug("Voice found in %s", voice_dir)
-                    voice_lang = lang_dir.name
-
-                    # Load config
-                    _LOGGER.debug("Loading config from %s", config_path)
-
-                    with open(config_path, "r", encoding="utf-8") as config_file:
-                        config = TrainingConfig.load(config_file)
-
-                    properties: typing.Dict[str, typing.Any] = {
-                        "length_scale": config.inference.length_scale,
-                        "noise_scale": config.inference.noise_scale,
-                        "noise_w": config.inference.noise_w,
-                    }
-
-                    # Load speaker names
-                    voice_name = voice_dir.name
-                    speakers: typing.Optional[typing.Sequence[str]] = None
-
-                    speakers_path = voice_dir / "speakers.txt"
-                    if speakers_path.is_file():
-                        speakers = []
-                        with open(
-                            speakers_path, "r", encoding="utf-8"
-                        ) as speakers_file:
-                            for line in speakers_file:
-                                line = line.strip()
-                                if line:
-                                    speakers.append(line)
-
-                    # Load aliases
-                    aliases: typing.Optional[typing.Set[str]] = None
-                    aliases_path = voice_dir / "ALIASES"
-                    if aliases_path.is_file():
-                        aliases = set()
-
-                        with open(aliases_path, "r", encoding="utf-8") as aliases_file:
-                            for line in aliases_file:
-                                line = line.strip()
-                                if line:
-                                    aliases.add(line)
-
-                    voice_key = f"{voice_lang}/{voice_name}"
-
-                    yield Voice(
-                        key=voice_key,
-                        name=voice_name,
-                        language=voice_lang,
-                        description="",
-                        speakers=speakers,
-                        location=str(voice_dir.absolute()),
-                        properties=properties,
-                        aliases=aliases,
-                    )
+            yield Voice(
+                key=voice_key,
+                name=voice_name,
+                language=voice_lang,
+                description="",
+                speakers=speakers,
+                location=str(voice_dir.absolute()),
+                properties=properties,
+                aliases=Mimic3TextToSpeechSystem._load_aliases(voice_dir),
+            )
 
-                    known_voices.discard(voice_key)
+            known_voices.discard(voice_key)
 
         # Yield voices that haven't yet been downloaded
+        voices_url_format = self.settings.voices_url_format or DEFAULT_VOICES_URL_FORMAT
         for voice_key in known_voices:
             voice_lang, voice_name = voice_key.split("/", maxsplit=1)
             voice_info = _VOICES.get(voice_key, {})
@@ -274,8 +294,7 @@ class Mimic3TextToSpeechSystem(TextToSpeechSystem):
                 language=voice_lang,
                 description="",
                 speakers=speakers,
-                location=str.format(
-                    self.settings.voices_url_format or DEFAULT_VOICES_URL_FORMAT,
+                location=voices_url_format.format(
                     lang=voice_lang,
                     name=voice_name,
                     key=voice_key,
@@ -283,10 +302,120 @@ class Mimic3TextToSpeechSystem(TextToSpeechSystem):
                 properties=properties,
             )
 
-    def preload_voice(self, voice_key: str):
+    def _get_voices_dirs(self) -> typing.List[Path]:
+        """Get directories to search for voices, in priority order"""
+        voices_dirs: typing.Iterable[
+            typing.Union[str, Path]
+        ] = Mimic3TextToSpeechSystem.get_default_voices_directories()
+
+        if self.settings.voices_directories is not None:
+            voices_dirs = itertools.chain(self.settings.voices_directories, voices_dirs)
+
+        # Skip directories that were already listed (e.g., same directory in
+        # voices_directories and XDG_DATA_DIRS) so voices aren't found twice.
+        unique_dirs: typing.Dict[Path, Path] = {}
+        for voices_dir in voices_dirs:
+            voices_dir = Path(voices_dir)
+            unique_dirs.setdefault(voices_dir.resolve(), voices_dir)
+
+        return list(unique_dirs.values())
+
+    def _scan_voice_dirs(self) -> typing.Iterable[typing.Tuple[str, Path]]:
+        """Yields (key, directory) for each voice on the file system"""
+        # voices/<language>/<voice>/
+        for voices_dir in self._get_voices_dirs():
+            if not voices_dir.is_dir() or voices_dir.name.startswith("."):
+                _LOGGER.debug("Skipping voice directory %s", voices_dir)
+                continue
+
+            _LOGGER.debug("Searching %s for voices", voices_dir)
+
+            # scandir entries usually know if they're directories without a
+            # separate stat() call.
+            with os.scandir(voices_dir) as lang_entries:
+                for lang_entry in lang_entries:
+                    if lang_entry.name.startswith(".") or not lang_entry.is_dir():
+                        continue
+
+                    with os.scandir(lang_entry.path) as voice_entries:
+                        for voice_entry in voice_entries:
+                            if (
+                                voice_entry.name.startswith(".")
+                                or not voice_entry.is_dir()
+                            ):
+                                continue
+
+                            if not os.path.isfile(
+                                os.path.join(voice_entry.path, "config.json")
+                            ):
+                                continue
+
+                            voice_dir = Path(voice_entry.path)
+                            _LOGGER.debug("Voice found in %s", voice_dir)
+
+                            yield f"{lang_entry.name}/{voice_entry.name}", voice_dir
+
+    @staticmethod
+    def _load_aliases(voice_dir: Path) -> typing.Optional[typing.Set[str]]:
+        """Load alternative keys for a voice from its ALIASES file"""
+        aliases: typing.Optional[typing.Set[str]] = None
+        aliases_path = voice_dir / "ALIASES"
+        if aliases_path.is_file():
+            aliases = set()
+
+            with open(aliases_path, "r", encoding="utf-8") as aliases_file:
+                for line in aliases_file:
+                    line = line.strip()
+                    if line:
+                        aliases.add(line)
+
+        return aliases
+
+    def _get_voice_index(self, refresh: bool = False) -> typing.Dict[str, str]:
+        """Get mapping from voice key, alias, or name to canonical voice key.
+
+        Also fills in _voice_dirs for voices on the file system.
+        Index is built on first use and rebuilt if refresh is True or the
+        voice directories have changed.
+        """
+        voices_dirs = self._get_voices_dirs()
+        index_dirs = tuple(str(voices_dir) for voices_dir in voices_dirs)
+
+        if (
+            refresh
+            or (self._voice_index is None)
+            or (self._voice_index_dirs != index_dirs)
+        ):
+            voice_index: typing.Dict[str, str] = {}
+            voice_dirs: typing.Dict[str, Path] = {}
+
+            # Earlier directories take priority
+            for voice_key, voice_dir in self._scan_voice_dirs():
+                if voice_key in voice_dirs:
+                    continue
+
+                voice_dirs[voice_key] = voice_dir
+                voice_index.setdefault(voice_key, voice_key)
+                voice_index.setdefault(voice_dir.name, voice_key)
+
+                for alias in Mimic3TextToSpeechSystem._load_aliases(voice_dir) or []:
+                    voice_index.setdefault(alias, voice_key)
+
+            # Voices that can be downloaded
+            for voice_key in _KNOWN_VOICE_KEYS:
+                voice_index.setdefault(voice_key, voice_key)
+
+            self._voice_index = voice_index
+            self._voice_dirs = voice_dirs
+            self._voice_index_dirs = index_dirs
+
+        return self._voice_index
+
+    def preload_voice(self, voice_key: str, warm_up: bool = True):
         """Ensure voice(s) are loaded in memory before synthesis.
 
         Voice key may contain wildcards (*).
+        If warm_up is True, a short dummy inference is run for each voice.
         """
         voice_keys = []
 
@@ -307,7 +436,10 @@ class Mimic3TextToSpeechSystem(TextToSpeechSystem):
             voice_keys.append(voice_key)
 
         for key_to_load in voice_keys:
-            self._get_or_load_voice(key_to_load)
+            voice = self._get_or_load_voice(key_to_load)
+
+            if warm_up:
+                voice.warm_up()
 
     # -------------------------------------------------------------------------
 
@@ -372,6 +504,28 @@ class Mimic3TextToSpeechSystem(TextToSpeechSystem):
         if append_text and (not text.endswith(append_text)):
             text += append_text
 
+        # Phonemization is deferred until end_utterance, so the first sentence
+        # can be synthesized before later sentences are processed.
+        settings_version, settings = self._get_settings_snapshot()
+        self._results.append(
+            self._text_to_results(
+                voice,
+                text,
+                text_language=text_language,
+                settings=settings,
+                settings_version=settings_version,
+            )
+        )
+
+    def _text_to_results(
+        self,
+        voice: Mimic3Voice,
+        text: str,
+        text_language: typing.Optional[str],
+        settings: Mimic3Settings,
+        settings_version: int,
+    ) -> typing.Iterable[typing.Union[BaseResult, Mimic3Phonemes]]:
+        """Lazily convert text into phonemes (and silence) for end_utterance"""
         # Automatic silence after major/minor breaks (optional)
         minor_break_ms = voice.config.inference.minor_break_ms
         major_break_ms = voice.config.inference.major_break_ms
@@ -394,21 +548,20 @@ class Mimic3TextToSpeechSystem(TextToSpeechSystem):
                 or add_minor_silence
             )
 
-            self._results.append(
-                Mimic3Phonemes(
-                    current_settings=deepcopy(self.settings),
-                    phonemes=sent_phonemes,
-                    is_utterance=is_utterance,
-                )
+            yield Mimic3Phonemes(
+                current_settings=settings,
+                phonemes=sent_phonemes,
+                is_utterance=is_utterance,
+                settings_version=settings_version,
             )
 
             # Add silence if using manual break intervals
             if add_major_silence:
                 assert major_break_ms is not None
-                self.add_break(major_break_ms)
+                yield self._make_silence(major_break_ms, settings.sample_rate)
             elif add_minor_silence:
                 assert minor_break_ms is not None
-                self.add_break(minor_break_ms)
+                yield self._make_silence(minor_break_ms, settings.sample_rate)
 
     # pylint: disable=arguments-differ
     def speak_tokens(
@@ -421,7 +574,7 @@ class Mimic3TextToSpeechSystem(TextToSpeechSystem):
 
         for token in tokens:
             if isinstance(token, Word):
-                word_phonemes = voice.word_to_phonemes(
+                word_phonemes = voice.cached_word_to_phonemes(
                     token.text, word_role=token.role, text_language=text_language
                 )
                 token_phonemes.append(word_phonemes)
@@ -441,44 +594,35 @@ class Mimic3TextToSpeechSystem(TextToSpeechSystem):
                 token_phonemes.extend(say_as_phonemes)
 
         if token_phonemes:
+            settings_version, settings = self._get_settings_snapshot()
             self._results.append(
                 Mimic3Phonemes(
-                    current_settings=deepcopy(self.settings),
+                    current_settings=settings,
                     phonemes=token_phonemes,
                     is_utterance=False,
+                    settings_version=settings_version,
                 )
             )
 
     def add_break(self, time_ms: int):
-        # Generate silence (16-bit mono at sample rate)
-        num_samples = int((time_ms / 1000.0) * self.settings.sample_rate)
-        audio_bytes = bytes(num_samples * 2)
-
-        self._results.append(
-            AudioResult(
-                sample_rate_hz=self.settings.sample_rate,
-                audio_bytes=audio_bytes,
-                # 16-bit mono
-                sample_width_bytes=2,
-                num_channels=1,
-            )
-        )
+        self._results.append(self._make_silence(time_ms, self.settings.sample_rate))
 
     def set_mark(self, name: str):
         self._results.append(MarkResult(name=name))
 
     def end_utterance(self) -> typing.Iterable[BaseResult]:
         last_settings: typing.Optional[Mimic3Settings] = None
+        last_settings_version: typing.Optional[int] = None
         sent_phonemes: PHONEMES_LIST_TYPE = []
 
-        for result in self._results:
+        for result in self._iter_results():
             if isinstance(result, Mimic3Phonemes):
                 if result.is_utterance:
                     # Utterance boundary
                     if (
                         sent_phonemes
-                        and (last_settings is not None)
-                        and (result.current_settings != last_settings)
+                        and (last_settings_version is not None)
+                        and (result.settings_version != last_settings_version)
                     ):
                         # Not compatible with existing utterance.
                         # Need to speak previous utterance first.
@@ -499,6 +643,7 @@ class Mimic3TextToSpeechSystem(TextToSpeechSystem):
                     sent_phonemes.extend(result.phonemes)
 
                 last_settings = result.current_settings
+                last_settings_version = result.settings_version
             else:
                 if sent_phonemes:
                     yield self._speak_sentence_phonemes(
@@ -512,10 +657,49 @@ class Mimic3TextToSpeechSystem(TextToSpeechSystem):
             yield self._speak_sentence_phonemes(sent_phonemes, settings=last_settings)
             sent_phonemes.clear()
 
-        self._results.clear()
-
     # -------------------------------------------------------------------------
 
+    def _get_settings_snapshot(self) -> typing.Tuple[int, Mimic3Settings]:
+        """Get (version, copy) of the current settings, reused until the settings change.
+
+        Settings used for synthesis are scalars or strings, so a shallow copy
+        is sufficient.
+        Settings may be modified directly (not just through properties), so
+        changes are detected by comparison.
+        """
+        if (self._settings_snapshot is None) or (
+            self._settings_snapshot != self.settings
+        ):
+            self._settings_snapshot = replace(self.settings)
+            self._settings_version += 1
+
+        return self._settings_version, self._settings_snapshot
+
+    def _iter_results(
+        self,
+    ) -> typing.Iterable[typing.Union[BaseResult, Mimic3Phonemes]]:
+        """Consume pending results in order, expanding lazy iterables"""
+        while self._results:
+            result = self._results.popleft()
+            if isinstance(result, (BaseResult, Mimic3Phonemes)):
+                yield result
+            else:
+                yield from result
+
+    @staticmethod
+    def _make_silence(time_ms: int, sample_rate: int) -> AudioResult:
+        """Generate silence (16-bit mono at sample rate)"""
+        num_samples = int((time_ms / 1000.0) * sample_rate)
+        audio_bytes = _silence_bytes(num_samples)
+
+        return AudioResult(
+            sample_rate_hz=sample_rate,
+            audio_bytes=audio_bytes,
+            # 16-bit mono
+            sample_width_bytes=2,
+            num_channels=1,
+        )
+
     def _speak_sentence_phonemes(
         self,
         sent_phonemes,
@@ -537,7 +721,11 @@ class Mimic3TextToSpeechSystem(TextToSpeechSystem):
             rate=settings.rate,
         )
 
-        audio_bytes = audio.tobytes()
+        # View of the audio array's memory instead of a copy.
+        # The array is kept alive by the view.
+        audio_bytes: typing.Union[bytes, memoryview] = np.ascontiguousarray(
+            audio
+        ).data.cast("B")
 
         if settings.volume != DEFAULT_VOLUME:
             audio_bytes = audioop.mul(audio_bytes, 2, settings.volume / 100.0)
@@ -552,41 +740,46 @@ class Mimic3TextToSpeechSystem(TextToSpeechSystem):
 
     def _get_or_load_voice(self, voice_key: str) -> Mimic3Voice:
         """Get a loaded voice or load from the file system"""
-        existing_voice = self._loaded_voices.get(voice_key)
+        existing_voice = self._loaded_voices.get(
+            self._voice_aliases.get(voice_key, voice_key)
+        )
         if existing_voice is not None:
             return existing_voice
 
-        # Look up as substring of known voice
-        model_dir: typing.Optional[Path] = None
-        for maybe_voice in self.get_voices():
-            if (voice_key == maybe_voice.key) or (
-                maybe_voice.aliases and (voice_key in maybe_voice.aliases)
-            ):
-                maybe_model_dir = Path(maybe_voice.location)
-
-                if (not maybe_model_dir.is_dir()) and (not self.settings.no_download):
-                    # Download voice
-                    maybe_model_dir = self._download_voice(voice_key)
+        # Look up by key, alias, or name of a voice.
+        # Refresh once in case voices were installed since the last scan.
+        canonical_key = self._get_voice_index().get(voice_key)
+        if canonical_key is None:
+            canonical_key = self._get_voice_index(refresh=True).get(voice_key)
 
-                if maybe_model_dir.is_dir():
-                    # Voice found
-                    model_dir = maybe_model_dir
-                    break
-
-        if model_dir is None:
+        if canonical_key is None:
             raise VoiceNotFoundError(voice_key)
 
-        voice_lang = model_dir.parent.name
-        voice_name = model_dir.name
-        canonical_key = f"{voice_lang}/{voice_name}"
+        if voice_key != canonical_key:
+            self._voice_aliases[voice_key] = canonical_key
 
         existing_voice = self._loaded_voices.get(canonical_key)
         if existing_voice is not None:
-            # Alias
-            self._loaded_voices[voice_key] = existing_voice
-
             return existing_voice
 
+        model_dir = self._voice_dirs.get(canonical_key)
+        if (model_dir is not None) and (not model_dir.is_dir()):
+            # Voice was moved or deleted since the last scan
+            self._get_voice_index(refresh=True)
+            model_dir = self._voice_dirs.get(canonical_key)
+
+        if (
+            (model_dir is None)
+            and (not self.settings.no_download)
+            and (canonical_key in _KNOWN_VOICE_KEYS)
+        ):
+            # Download voice
+            model_dir = self._download_voice(canonical_key)
+            self._voice_index = None
+
+        if (model_dir is None) or (not model_dir.is_dir()):
+            raise VoiceNotFoundError(voice_key)
+
         # https://onnxruntime.ai/docs/execution-providers/
         providers = None
         if self.settings.use_cuda:
@@ -602,7 +795,6 @@ class Mimic3TextToSpeechSystem(TextToSpeechSystem):
         _LOGGER.info("Loaded voice from %s", model_dir)
 
         # Add to cache
-        self._loaded_voices[voice_key] = voice
         self._loaded_voices[canonical_key] = voice
 
         return voice
@@ -21,12 +21,11 @@ import time
 import typing
 from abc import ABCMeta, abstractmethod
 from enum import Enum
+from functools import lru_cache
 from pathlib import Path
 from xml.sax.saxutils import escape as xmlescape
 
-import epitran
 import espeak_phonemizer
-import gruut
 import numpy as np
 import onnxruntime
 import phonemes2ids
@@ -36,6 +35,9 @@ from .config import Phonemizer, TrainingConfig
 from .const import DEFAULT_RATE
 from .utils import audio_float_to_int16, to_codepoints
 
+if typing.TYPE_CHECKING:
+    import epitran
+
 # -----------------------------------------------------------------------------
 
 
@@ -59,6 +61,9 @@ SPEAKER_MAP_TYPE = typing.Dict[SPEAKER_NAME_TYPE, SPEAKER_ID_TYPE]
 
 DEFAULT_LANGUAGE = "en_US"
 
+# Maximum number of (word, role, language) phonemizations to cache per voice
+WORD_PHONEMES_CACHE_SIZE = 50_000
+
 _LOGGER = logging.getLogger(__name__)
 
 
@@ -85,6 +90,10 @@ class Mimic3Voice(metaclass=ABCMeta):
         self.phoneme_map = phoneme_map
         self.speaker_map = speaker_map
 
+        self._word_phonemes_cache = lru_cache(maxsize=WORD_PHONEMES_CACHE_SIZE)(
+            self._word_to_phonemes_tuple
+        )
+
     @abstractmethod
     def text_to_phonemes(
         self, text: str, text_language: typing.Optional[str] = None
@@ -107,6 +116,28 @@ class Mimic3Voice(metaclass=ABCMeta):
 
         return word_phonemes
 
+    def cached_word_to_phonemes(
+        self,
+        word_text: str,
+        word_role: typing.Optional[str] = None,
+        text_language: typing.Optional[str] = None,
+    ) -> typing.List[PHONEME_TYPE]:
+        """Same as word_to_phonemes, but repeated words are looked up in a cache"""
+        return list(self._word_phonemes_cache(word_text, word_role, text_language))
+
+    def _word_to_phonemes_tuple(
+        self,
+        word_text: str,
+        word_role: typing.Optional[str],
+        text_language: typing.Optional[str],
+    ) -> typing.Tuple[PHONEME_TYPE, ...]:
+        """Immutable word_to_phonemes result, so it can be shared from the cache"""
+        return tuple(
+            self.word_to_phonemes(
+                word_text, word_role=word_role, text_language=text_language
+            )
+        )
+
     def say_as_to_phonemes(
         self,
         text: str,
@@ -123,13 +154,14 @@ class Mimic3Voice(metaclass=ABCMeta):
 
         return word_phonemes
 
-    def phonemes_to_ids(
-        self, phonemes: WORD_PHONEMES_TYPE
-    ) -> typing.Sequence[PHONEME_ID_TYPE]:
-        """Convert phonemes to ids for a voice model (see phonemes.txt)"""
+    def phonemes_to_ids(self, phonemes: WORD_PHONEMES_TYPE) -> np.ndarray:
+        """Convert phonemes to ids for a voice model (see phonemes.txt).
+
+        Returns a flat int64 array that can be passed to the model without copying.
+        """
         phoneme_map = self.phoneme_map or self.config.phonemes.phoneme_map
 
-        return phonemes2ids.phonemes2ids(
+        phoneme_ids = phonemes2ids.phonemes2ids(
             word_phonemes=phonemes,
             phoneme_to_id=self.phoneme_to_id,
             pad=self.config.phonemes.pad,
@@ -151,9 +183,11 @@ class Mimic3Voice(metaclass=ABCMeta):
             fail_on_missing=False,
         )
 
+        return np.fromiter(phoneme_ids, dtype=np.int64, count=len(phoneme_ids))
+
     def ids_to_audio(
         self,
-        phoneme_ids: typing.Sequence[PHONEME_ID_TYPE],
+        phoneme_ids: typing.Union[np.ndarray, typing.Sequence[PHONEME_ID_TYPE]],
         speaker: typing.Optional[
             typing.Union[SPEAKER_NAME_TYPE, SPEAKER_ID_TYPE]
         ] = None,
@@ -177,7 +211,7 @@ class Mimic3Voice(metaclass=ABCMeta):
             noise_w = self.config.inference.noise_w
 
         # Create model inputs
-        text_array = np.expand_dims(np.array(phoneme_ids, dtype=np.int64), 0)
+        text_array = np.asarray(phoneme_ids, dtype=np.int64)[np.newaxis, :]
         text_lengths_array = np.array([text_array.shape[1]], dtype=np.int64)
         scales_array = np.array(
             [
@@ -242,6 +276,18 @@ class Mimic3Voice(metaclass=ABCMeta):
 
         return audio
 
+    def warm_up(self):
+        """Run a short dummy inference so Onnx runtime is initialized before real synthesis"""
+        phoneme_ids = sorted(self.phoneme_to_id.values())[:5]
+        if not phoneme_ids:
+            return
+
+        start_time = time.perf_counter()
+        self.ids_to_audio(phoneme_ids)
+        end_time = time.perf_counter()
+
+        _LOGGER.debug("Warmed up voice in %s second(s)", end_time - start_time)
+
     @staticmethod
     def load_from_directory(
         voice_dir: typing.Union[str, Path],
@@ -416,6 +462,8 @@ class GruutVoice(Mimic3Voice):
     def text_to_phonemes(
         self, text: str, text_language: typing.Optional[str] = None
     ) -> TEXT_TO_PHONEMES_TYPE:
+        import gruut
+
         text_language = text_language or self.config.text_language or DEFAULT_LANGUAGE
         for sentence in gruut.sentences(text, lang=text_language):
             sent_phonemes = [w.phonemes for w in sentence if w.phonemes]
@@ -428,6 +476,8 @@ class GruutVoice(Mimic3Voice):
         word_role: typing.Optional[str] = None,
         text_language: typing.Optional[str] = None,
     ) -> typing.List[PHONEME_TYPE]:
+        import gruut
+
         text_language = text_language or self.config.text_language or DEFAULT_LANGUAGE
 
         word_role = xmlescape(word_role) if word_role else ""
@@ -454,6 +504,8 @@ class GruutVoice(Mimic3Voice):
         say_format: typing.Optional[str] = None,
         text_language: typing.Optional[str] = None,
     ) -> WORD_PHONEMES_TYPE:
+        import gruut
+
         text_language = text_language or self.config.text_language or DEFAULT_LANGUAGE
 
         word_text = xmlescape(text)
@@ -725,7 +777,7 @@ class EpitranVoice(Mimic3Voice):
 
     def __init__(self, *args, **kwargs):
         super().__init__(*args, **kwargs)
-        self._epis: typing.Dict[str, epitran.Epitran] = {}
+        self._epis: typing.Dict[str, "epitran.Epitran"] = {}
 
     def text_to_phonemes(
         self, text: str, text_language: typing.Optional[str] = None
@@ -734,6 +786,8 @@ class EpitranVoice(Mimic3Voice):
 
         epi = self._epis.get(text_language)
         if epi is None:
+            import epitran
+
             epi = epitran.Epitran(text_language)
             self._epis[text_language] = epi
 
@@ -106,8 +106,12 @@ class _AudioResultBase:
     num_channels: int
     """Number of audio channels (e.g., 1)"""
 
-    audio_bytes: bytes
-    """Raw audio bytes (no header)"""
+    audio_bytes: typing.Union[bytes, memoryview]
+    """Raw audio bytes (no header).
+
+    May be a memoryview of another buffer, which cannot be pickled or
+    concatenated with bytes. Use bytes(audio_bytes) to get a copy.
+    """
 
 
 @dataclass
@@ -277,7 +281,8 @@ class TextToSpeechSystem(AbstractContextManager, metaclass=ABCMeta):
     def end_utterance(self) -> typing.Iterable[BaseResult]:
         """Complete an utterance after begin_utterance().
 
-        Returns an iterable of results (audio, marks, etc.)
+        Returns an iterable of results (audio, marks, etc.).
+        Results may be produced lazily as the iterable is consumed.
         """
 
     def text_to_wav(
@@ -59,6 +59,8 @@ for lang in [
 ]:
     extras[f"gruut[{lang}]"] = [lang]
 
+# Faster parsing of voice configs
+extras["orjson>=3,<4"] = ["orjson"]
 
 # Add "all" tag
 for tags in extras.values():